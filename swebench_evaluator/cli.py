@@ -6,6 +6,8 @@ import argparse
 from pathlib import Path
 
 from swebench_evaluator.evaluator import SWEBenchEvaluator
+from swebench_evaluator.result_cache import DEFAULT_RESULT_CACHE_SIZE
+from swebench_evaluator.distributed import Coordinator, Worker
 
 
 def setup_argparse():
@@ -67,17 +69,83 @@ def setup_argparse():
         help="Directory for outputting results",
     )
 
+    coordinator_parser = subparsers.add_parser(
+        "coordinator", help="Serve batch evaluation jobs to distributed workers"
+    )
+    coordinator_parser.add_argument(
+        "config_file", help="JSON file with evaluation configurations"
+    )
+    coordinator_parser.add_argument(
+        "--output-dir",
+        "-o",
+        default="./results",
+        help="Directory for outputting results",
+    )
+    coordinator_parser.add_argument(
+        "--host", default="127.0.0.1", help="Address to listen on"
+    )
+    coordinator_parser.add_argument(
+        "--port", type=int, default=8765, help="Port to listen on"
+    )
+    coordinator_parser.add_argument(
+        "--lease-timeout",
+        type=float,
+        default=120,
+        help="Seconds without a heartbeat before a job is requeued",
+    )
+    coordinator_parser.add_argument(
+        "--steal-after",
+        type=float,
+        default=600,
+        help="Seconds a job may run before idle workers may steal it",
+    )
+    coordinator_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Failed evaluations of a job before it is recorded as an error",
+    )
+
+    worker_parser = subparsers.add_parser(
+        "worker", help="Evaluate jobs served by a coordinator"
+    )
+    worker_parser.add_argument(
+        "coordinator_url", help="Coordinator URL, e.g. http://127.0.0.1:8765"
+    )
+    worker_parser.add_argument("--worker-id", help="Name reported to the coordinator")
+    worker_parser.add_argument(
+        "--heartbeat-interval",
+        type=float,
+        default=10,
+        help="Seconds between lease heartbeats",
+    )
+    worker_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5,
+        help="Seconds to wait before asking for work again when none is available",
+    )
+
     for subparser in [
         list_parser,
         details_parser,
         setup_parser,
         evaluate_parser,
         batch_parser,
+        worker_parser,
     ]:
         subparser.add_argument(
             "--cache-dir", help="Directory to cache repositories and dataset"
         )
 
+    for subparser in [evaluate_parser, batch_parser, worker_parser]:
+        subparser.add_argument(
+            "--result-cache-size",
+            type=int,
+            default=DEFAULT_RESULT_CACHE_SIZE,
+            help="Maximum number of cached evaluation results (0 disables the cache)",
+        )
+
     return parser
 
 
@@ -166,6 +234,46 @@ def batch_evaluate(evaluator: SWEBenchEvaluator, args):
         )
         print_json(results, str(output_file))
 
+    if not evaluator.result_cache.enabled:
+        return
+
+    cache_stats = evaluator.result_cache.stats()
+    print(
+        f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"({cache_stats['entries']}/{cache_stats['max_entries']} entries)"
+    )
+
+
+def run_coordinator(args):
+    with open(args.config_file, "r") as f:
+        configs = json.load(f)
+
+    coordinator = Coordinator(
+        configs,
+        args.output_dir,
+        host=args.host,
+        port=args.port,
+        lease_timeout=args.lease_timeout,
+        steal_after=args.steal_after,
+        max_attempts=args.max_attempts,
+    )
+    summary = coordinator.serve()
+    print_json(summary)
+
+
+def run_worker(evaluator: SWEBenchEvaluator, args):
+    worker = Worker(
+        evaluator,
+        args.coordinator_url,
+        worker_id=args.worker_id,
+        heartbeat_interval=args.heartbeat_interval,
+        poll_interval=args.poll_interval,
+    )
+    try:
+        worker.run()
+    except RuntimeError as e:
+        sys.exit(f"Error: {e}")
+
 
 def main():
     parser = setup_argparse()
@@ -175,7 +283,16 @@ def main():
         parser.print_help()
         return
 
-    evaluator = SWEBenchEvaluator(cache_dir=args.cache_dir)
+    # The coordinator never checks out repositories or runs tests
+    if args.command == "coordinator":
+        run_coordinator(args)
+        return
+
+    # Only commands that evaluate solutions use the result cache
+    evaluator = SWEBenchEvaluator(
+        cache_dir=args.cache_dir,
+        result_cache_size=getattr(args, "result_cache_size", 0),
+    )
 
     if args.command == "list":
         list_problems(evaluator, args)
@@ -187,6 +304,8 @@ def main():
         evaluate_solution(evaluator, args)
     elif args.command == "batch":
         batch_evaluate(evaluator, args)
+    elif args.command == "worker":
+        run_worker(evaluator, args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,556 @@
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def repo_from_instance_id(instance_id):
+    """
+    SWE-bench instance IDs look like "owner__name-1234", which maps back to
+    the "owner/name" repository.
+    """
+    return instance_id.rsplit("-", 1)[0].replace("__", "/")
+
+
+def repo_cache_name(repo_name):
+    # Matches the directory layout used by SWEBenchEvaluator.clone_or_update_repo
+    return repo_name.replace("/", "_")
+
+
+class Coordinator:
+    """
+    Serves a queue of (instance, solution) jobs to workers over HTTP.
+
+    Workers lease jobs and must heartbeat to keep them. A job whose lease
+    expires goes back to the queue, and once the queue is empty, idle workers
+    steal jobs that have been running for longer than steal_after seconds.
+    The first result reported for a job wins. A job whose evaluation raised is
+    requeued, preferably to another worker, until it has failed max_attempts
+    times, and is then recorded with an error.
+    """
+
+    def __init__(
+        self,
+        configs,
+        output_dir,
+        host="127.0.0.1",
+        port=8765,
+        lease_timeout=120,
+        steal_after=600,
+        max_attempts=3,
+    ):
+        self.output_dir = Path(output_dir)
+        self.host = host
+        self.port = port
+        self.lease_timeout = lease_timeout
+        self.steal_after = steal_after
+        self.max_attempts = max_attempts
+
+        self.jobs = {}
+        self.pending = []
+        self.in_flight = {}
+        self.completed = {}
+        self.last_seen = {}
+        self.stolen = 0
+        self.requeued = 0
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self.server = None
+
+        for i, config in enumerate(configs):
+            job_id = str(i)
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "instance_id": config["instance_id"],
+                "solution_commit": config["solution_commit"],
+                "repo": config.get("repo")
+                or repo_from_instance_id(config["instance_id"]),
+                "failures": [],
+            }
+            self.pending.append(job_id)
+
+        if not self.jobs:
+            self.finished.set()
+
+    def _reclaim_expired_leases(self, now):
+        for job_id in list(self.in_flight):
+            holders = self.in_flight[job_id]
+            for worker_id in [w for w, l in holders.items() if l["expires"] < now]:
+                print(f"Lease on job {job_id} held by {worker_id} expired")
+                del holders[worker_id]
+            if not holders:
+                del self.in_flight[job_id]
+                self.pending.insert(0, job_id)
+                self.requeued += 1
+
+    def _pick_pending(self, worker_id, cached_repos, now):
+        active = {
+            w for w, seen in self.last_seen.items() if now - seen <= self.lease_timeout
+        }
+
+        # A job goes back to a worker it already failed on only once every
+        # live worker has failed it
+        def eligible(job_id):
+            failed_on = {f["worker_id"] for f in self.jobs[job_id]["failures"]}
+            return worker_id not in failed_on or active <= failed_on
+
+        candidates = [job_id for job_id in self.pending if eligible(job_id)]
+        for job_id in candidates:
+            if repo_cache_name(self.jobs[job_id]["repo"]) in cached_repos:
+                return job_id
+        return candidates[0] if candidates else None
+
+    def _pick_steal(self, worker_id, now):
+        if self.steal_after is None:
+            return None
+
+        candidates = [
+            (min(l["started"] for l in holders.values()), job_id)
+            for job_id, holders in self.in_flight.items()
+            if worker_id not in holders and len(holders) < 2
+        ]
+        if not candidates:
+            return None
+
+        started, job_id = min(candidates)
+        return job_id if now - started >= self.steal_after else None
+
+    def lease(self, worker_id, cached_repos=()):
+        cached_repos = set(cached_repos)
+        with self.lock:
+            now = time.time()
+            self.last_seen[worker_id] = now
+            self._reclaim_expired_leases(now)
+
+            job_id = self._pick_pending(worker_id, cached_repos, now)
+            if job_id is not None:
+                self.pending.remove(job_id)
+            else:
+                job_id = self._pick_steal(worker_id, now)
+                if job_id is not None:
+                    print(f"Worker {worker_id} stealing job {job_id}")
+                    self.stolen += 1
+
+            if job_id is None:
+                return {"job": None, "done": self.finished.is_set()}
+
+            self.in_flight.setdefault(job_id, {})[worker_id] = {
+                "started": now,
+                "expires": now + self.lease_timeout,
+            }
+            job = self.jobs[job_id]
+            print(
+                f"Leased job {job_id} ({job['instance_id']}) to worker {worker_id}"
+            )
+            return {
+                "job": {
+                    "job_id": job_id,
+                    "instance_id": job["instance_id"],
+                    "solution_commit": job["solution_commit"],
+                    "repo": job["repo"],
+                },
+                "lease_timeout": self.lease_timeout,
+            }
+
+    def heartbeat(self, worker_id, job_id):
+        with self.lock:
+            self.last_seen[worker_id] = time.time()
+            holders = self.in_flight.get(job_id, {})
+            if worker_id not in holders:
+                return {"ok": False, "completed": job_id in self.completed}
+
+            holders[worker_id]["expires"] = time.time() + self.lease_timeout
+            return {"ok": True, "completed": False}
+
+    def _record(self, job_id, worker_id, result):
+        """
+        Write a job's final result and mark it completed. Must be called with
+        the lock held.
+        """
+        # The file name only uses values the coordinator controls, since
+        # results come from unauthenticated clients. Several tools usually
+        # submit solutions for the same instance, so the job ID keeps their
+        # result files apart.
+        instance_id = self.jobs[job_id]["instance_id"]
+        output_file = self.output_dir / (
+            f"{instance_id}_{job_id}_{int(time.time())}.json"
+        )
+        result["worker_id"] = worker_id
+        with open(output_file, "w") as f:
+            json.dump(result, f, indent=2)
+
+        # A result from an expired lease is still valid, so take it even if
+        # the job was requeued in the meantime
+        self.in_flight.pop(job_id, None)
+        if job_id in self.pending:
+            self.pending.remove(job_id)
+        self.completed[job_id] = result
+        done, total = len(self.completed), len(self.jobs)
+        if done == total:
+            self.finished.set()
+
+        print(
+            f"Completed {done}/{total}: {instance_id} "
+            f"from worker {worker_id}, saved to {output_file}"
+        )
+
+    def complete(self, worker_id, job_id, result):
+        if not isinstance(result, dict):
+            raise TypeError("result must be a JSON object")
+
+        with self.lock:
+            if job_id not in self.jobs or job_id in self.completed:
+                return {"accepted": False}
+
+            self._record(job_id, worker_id, result)
+            return {"accepted": True}
+
+    def fail(self, worker_id, job_id, error):
+        with self.lock:
+            if job_id not in self.jobs or job_id in self.completed:
+                return {"accepted": False}
+
+            job = self.jobs[job_id]
+            job["failures"].append({"worker_id": worker_id, "error": str(error)})
+            attempts = len(job["failures"])
+            print(
+                f"Job {job_id} failed on worker {worker_id} "
+                f"(attempt {attempts}/{self.max_attempts}): {error}"
+            )
+
+            if attempts >= self.max_attempts:
+                self._record(
+                    job_id,
+                    worker_id,
+                    {
+                        "instance_id": job["instance_id"],
+                        "solution_commit": job["solution_commit"],
+                        "timestamp": time.time(),
+                        "error": str(error),
+                        "failures": list(job["failures"]),
+                    },
+                )
+                return {"accepted": True}
+
+            holders = self.in_flight.get(job_id, {})
+            holders.pop(worker_id, None)
+            # A stolen copy of the job may still be running elsewhere
+            if not holders:
+                self.in_flight.pop(job_id, None)
+                if job_id not in self.pending:
+                    self.pending.append(job_id)
+                    self.requeued += 1
+            return {"accepted": True}
+
+    def status(self):
+        with self.lock:
+            return {
+                "total": len(self.jobs),
+                "pending": len(self.pending),
+                "in_flight": len(self.in_flight),
+                "completed": len(self.completed),
+                "stolen": self.stolen,
+                "requeued": self.requeued,
+                "failed_attempts": sum(len(j["failures"]) for j in self.jobs.values()),
+                "workers": sorted(
+                    {w for holders in self.in_flight.values() for w in holders}
+                ),
+            }
+
+    def start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.server = ThreadingHTTPServer(
+            (self.host, self.port), _make_handler(self)
+        )
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{self.host}:{self.port}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def serve(self, linger=10):
+        """
+        Serve jobs until every job has a result, then keep answering for
+        `linger` seconds so idle workers learn that the queue is done.
+        """
+        url = self.start()
+        print(f"Coordinator serving {len(self.jobs)} jobs at {url}")
+        try:
+            self.finished.wait()
+            time.sleep(linger)
+        finally:
+            self.stop()
+
+        summary = self.status()
+        with open(self.output_dir / "summary.json", "w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def _make_handler(coordinator):
+    class CoordinatorHandler(BaseHTTPRequestHandler):
+        def _send_json(self, data, status=200):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/status":
+                self._send_json(coordinator.status())
+            else:
+                self._send_json({"error": "not found"}, status=404)
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send_json({"error": "invalid JSON"}, status=400)
+                return
+
+            try:
+                if self.path == "/lease":
+                    response = coordinator.lease(
+                        payload["worker_id"], payload.get("cached_repos", [])
+                    )
+                elif self.path == "/heartbeat":
+                    response = coordinator.heartbeat(
+                        payload["worker_id"], payload["job_id"]
+                    )
+                elif self.path == "/result":
+                    response = coordinator.complete(
+                        payload["worker_id"], payload["job_id"], payload["result"]
+                    )
+                elif self.path == "/fail":
+                    response = coordinator.fail(
+                        payload["worker_id"], payload["job_id"], payload["error"]
+                    )
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+                    return
+            except KeyError as e:
+                self._send_json({"error": f"missing field {e}"}, status=400)
+                return
+            except (ValueError, TypeError) as e:
+                self._send_json({"error": str(e)}, status=400)
+                return
+            except OSError as e:
+                self._send_json({"error": str(e)}, status=500)
+                return
+
+            self._send_json(response)
+
+        def log_message(self, format, *args):
+            # Heartbeats would otherwise flood the coordinator's output
+            pass
+
+    return CoordinatorHandler
+
+
+class Worker:
+    """
+    Pulls jobs from a Coordinator, evaluates them with a SWEBenchEvaluator
+    and streams each result back as soon as it is ready.
+
+    A worker holds an exclusive lock on the evaluator's repository cache while
+    it runs, since two workers checking out commits in the same clones would
+    mix up each other's results.
+    """
+
+    def __init__(
+        self,
+        evaluator,
+        coordinator_url,
+        worker_id=None,
+        heartbeat_interval=10,
+        poll_interval=5,
+        max_retries=5,
+    ):
+        self.evaluator = evaluator
+        self.coordinator_url = coordinator_url.rstrip("/")
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        )
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.max_retries = max_retries
+        self.unreported = []
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(
+            self.coordinator_url + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        for attempt in range(self.max_retries):
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    return json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                # Client errors fail the same way every time
+                if e.code < 500 or attempt == self.max_retries - 1:
+                    raise
+                print(f"Coordinator error: {e}, retrying...")
+            except (urllib.error.URLError, ConnectionError, socket.timeout) as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                print(f"Error contacting coordinator: {e}, retrying...")
+            time.sleep(self.poll_interval)
+
+    def _lock_cache(self):
+        lock_file = open(Path(self.evaluator.repos_dir) / ".worker.lock", "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(
+                f"Another worker is already using {self.evaluator.repos_dir}, "
+                f"start this worker with a different --cache-dir"
+            )
+        return lock_file
+
+    def cached_repos(self):
+        return [p.name for p in self.evaluator.repos_dir.iterdir() if p.is_dir()]
+
+    def _heartbeat(self, job_id, stop, cancelled):
+        lease_lost = False
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                response = self._post(
+                    "/heartbeat", {"worker_id": self.worker_id, "job_id": job_id}
+                )
+            except Exception as e:
+                print(f"Heartbeat for job {job_id} failed: {e}")
+                continue
+            if response["completed"]:
+                print(f"Job {job_id} was completed by another worker, abandoning it")
+                cancelled.set()
+                return
+            if not response["ok"] and not lease_lost:
+                print(f"Lost lease on job {job_id}")
+                lease_lost = True
+
+    def run_job(self, job):
+        """
+        Evaluate a job while keeping its lease alive. Returns the report to
+        send to the coordinator as a (path, payload) pair, or None if another
+        worker completed the job first.
+        """
+        stop = threading.Event()
+        cancelled = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(job["job_id"], stop, cancelled),
+            daemon=True,
+        )
+        heartbeat.start()
+        report = {"worker_id": self.worker_id, "job_id": job["job_id"]}
+        try:
+            result = self.evaluator.evaluate_solution(
+                job["instance_id"], job["solution_commit"], cancelled=cancelled
+            )
+        except Exception as e:
+            # The failure may be specific to this worker (a flaky network or a
+            # full disk), so let the coordinator retry the job elsewhere
+            print(f"Error evaluating job {job['job_id']}: {e}")
+            return "/fail", dict(report, error=str(e))
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        if cancelled.is_set():
+            return None
+        return "/result", dict(report, result=result)
+
+    def _flush_reports(self):
+        """
+        Send queued reports to the coordinator, keeping any it could not store
+        for a later attempt. Returns the number of results accepted.
+        """
+        accepted = 0
+        while self.unreported:
+            path, payload = self.unreported[0]
+            try:
+                response = self._post(path, payload)
+            except urllib.error.HTTPError as e:
+                if e.code >= 500:
+                    print(f"Coordinator could not store job {payload['job_id']}: {e}")
+                    break
+                print(f"Coordinator rejected report for job {payload['job_id']}: {e}")
+                self.unreported.pop(0)
+                continue
+            except (urllib.error.URLError, ConnectionError, socket.timeout) as e:
+                print(f"Could not report job {payload['job_id']}: {e}")
+                break
+
+            self.unreported.pop(0)
+            if not response["accepted"]:
+                print(
+                    f"Job {payload['job_id']} was already completed by another worker"
+                )
+            elif path == "/result":
+                accepted += 1
+        return accepted
+
+    def run(self):
+        lock_file = self._lock_cache()
+        try:
+            return self._run()
+        finally:
+            lock_file.close()
+
+    def _run(self):
+        completed = 0
+        print(f"Worker {self.worker_id} connecting to {self.coordinator_url}")
+        while True:
+            completed += self._flush_reports()
+            try:
+                response = self._post(
+                    "/lease",
+                    {"worker_id": self.worker_id, "cached_repos": self.cached_repos()},
+                )
+            except (urllib.error.URLError, ConnectionError, socket.timeout) as e:
+                print(f"Could not lease a job from the coordinator: {e}")
+                break
+
+            job = response["job"]
+            if job is None:
+                if response["done"]:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            print(f"Evaluating job {job['job_id']}: {job['instance_id']}")
+            report = self.run_job(job)
+            if report is not None:
+                self.unreported.append(report)
+
+        if self.unreported:
+            print(f"Worker {self.worker_id} exiting with unreported jobs:")
+            for path, payload in self.unreported:
+                print(f"  - job {payload['job_id']} ({path})")
+        print(f"Worker {self.worker_id} finished after {completed} jobs")
+        return completed
@@ -8,13 +8,23 @@ import datasets
 import git
 import time
 
+from .result_cache import (
+    DEFAULT_RESULT_CACHE_SIZE,
+    ResultCache,
+    hash_tests,
+    environment_fingerprint,
+)
+
 
 class SWEBenchEvaluator:
-    def __init__(self, cache_dir=None):
+    def __init__(self, cache_dir=None, result_cache_size=DEFAULT_RESULT_CACHE_SIZE):
         self.cache_dir = cache_dir or Path.home() / ".swebench_evaluator"
         self.repos_dir = Path(self.cache_dir) / "repos"
         self.dataset = None
         self.repos_dir.mkdir(parents=True, exist_ok=True)
+        self.result_cache = ResultCache(
+            Path(self.cache_dir) / "results", max_entries=result_cache_size
+        )
 
     def load_dataset(self):
         self.dataset = datasets.load_dataset("princeton-nlp/SWE-bench_Verified")
@@ -68,6 +78,24 @@ class SWEBenchEvaluator:
                     return str(candidate)
         return "python"
 
+    def get_result_cache_key(
+        self, repo, repo_path, instance_id, solution_commit, fail_to_pass, pass_to_pass
+    ):
+        """
+        Build the result cache key for a solution, or return None if the
+        solution commit cannot be resolved to a tree.
+        """
+        try:
+            tree_hash = repo.commit(solution_commit).tree.hexsha
+        except Exception:
+            return None
+        return self.result_cache.make_key(
+            instance_id,
+            tree_hash,
+            hash_tests(fail_to_pass, pass_to_pass),
+            environment_fingerprint(self.get_python_executable(Path(repo_path))),
+        )
+
     def run_tests(self, repo_path, tests, timeout=300):
         results = {}
         repo_path = Path(repo_path)
@@ -113,7 +141,12 @@ class SWEBenchEvaluator:
 
         return results
 
-    def evaluate_solution(self, instance_id, solution_commit):
+    def evaluate_solution(self, instance_id, solution_commit, cancelled=None):
+        """
+        `cancelled` is an optional threading.Event; if it is set by the time the
+        base commit has been tested, the solution commit is skipped and the
+        result is marked as cancelled.
+        """
         problem = self.get_problem_by_id(instance_id)
         repo_name = problem["repo"]
         base_commit = problem["base_commit"]
@@ -140,6 +173,35 @@ class SWEBenchEvaluator:
             },
         }
 
+        cache_key = None
+        if self.result_cache.enabled:
+            cache_key = self.get_result_cache_key(
+                repo,
+                repo_path,
+                instance_id,
+                solution_commit,
+                fail_to_pass_tests,
+                pass_to_pass_tests,
+            )
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                print(
+                    f"Result cache hit: solution commit {solution_commit} has the "
+                    f"same tree as previously evaluated commit "
+                    f"{cached['solution_commit']}"
+                )
+                results["before"] = cached["before"]
+                results["after"] = cached["after"]
+                results["metrics"] = cached["metrics"]
+                results["cache"] = {
+                    "hit": True,
+                    "key": cache_key,
+                    "evaluated_commit": cached["solution_commit"],
+                }
+                return results
+            print("Result cache miss, running tests...")
+            results["cache"] = {"hit": False, "key": cache_key}
+
         try:
             print(f"Checking out base commit {base_commit}...")
             repo.git.checkout(base_commit, force=True)
@@ -152,6 +214,11 @@ class SWEBenchEvaluator:
                 repo_path, pass_to_pass_tests
             )
 
+            if cancelled is not None and cancelled.is_set():
+                print("Evaluation cancelled, skipping solution commit")
+                results["cancelled"] = True
+                return results
+
             print(f"Checking out solution commit {solution_commit}...")
             repo.git.checkout(solution_commit, force=True)
 
@@ -192,6 +259,26 @@ class SWEBenchEvaluator:
             print(f"Broken tests: {broken_tests}/{len(pass_to_pass_tests)}")
             print(f"Success rate: {results['metrics']['success_rate']:.2%}")
 
+            # A timeout or run error may be transient, so it must not be served
+            # again for every later commit with the same tree
+            run_errors = any(
+                "error" in test_result
+                for phase in ("before", "after")
+                for group in results[phase].values()
+                for test_result in group.values()
+            )
+            if cache_key is not None and not run_errors:
+                self.result_cache.put(
+                    cache_key,
+                    {
+                        "instance_id": instance_id,
+                        "solution_commit": solution_commit,
+                        "before": results["before"],
+                        "after": results["after"],
+                        "metrics": results["metrics"],
+                    },
+                )
+
         except Exception as e:
             print(f"Error during evaluation: {e}")
             results["error"] = str(e)
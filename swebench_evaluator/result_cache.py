@@ -0,0 +1,154 @@
+import json
+import time
+import hashlib
+import subprocess
+from pathlib import Path
+
+DEFAULT_RESULT_CACHE_SIZE = 256
+
+
+def hash_tests(fail_to_pass_tests, pass_to_pass_tests):
+    tests = [sorted(fail_to_pass_tests), sorted(pass_to_pass_tests)]
+    return hashlib.sha256(json.dumps(tests).encode("utf-8")).hexdigest()
+
+
+# Run with the interpreter the tests use; falls back to pkg_resources for
+# interpreters older than 3.8. Isolated mode (-I) keeps the working directory
+# off sys.path, so metadata in whatever directory we happen to be in is not
+# mistaken for an installed package.
+_ENVIRONMENT_SCRIPT = """
+import sys, platform
+print(sys.version)
+print(platform.platform())
+try:
+    from importlib.metadata import distributions
+    packages = [(d.metadata["Name"], d.version) for d in distributions()]
+except ImportError:
+    import pkg_resources
+    packages = [(d.project_name, d.version) for d in pkg_resources.working_set]
+for name, version in sorted(set(packages), key=str):
+    print(f"{name}=={version}")
+"""
+
+
+def environment_fingerprint(python_executable):
+    """
+    Identify the interpreter the tests run under and the packages installed in
+    it, so results recorded with one environment are never served for another.
+    """
+    try:
+        process = subprocess.run(
+            [python_executable, "-I", "-c", _ENVIRONMENT_SCRIPT],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        details = process.stdout + process.stderr
+    except Exception as e:
+        details = f"unavailable: {e}"
+    return hashlib.sha256(
+        f"{python_executable}\n{details}".encode("utf-8")
+    ).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of evaluation results keyed by
+    (instance_id, solution tree hash, test list hash, environment fingerprint).
+    Holds at most max_entries results, evicting the least recently used.
+    A max_entries of 0 disables the cache.
+    """
+
+    ENTRY_KEYS = ("solution_commit", "before", "after", "metrics")
+
+    # Temporary files older than this were left behind by an interrupted put
+    TMP_MAX_AGE = 3600
+
+    def __init__(self, cache_dir, max_entries=DEFAULT_RESULT_CACHE_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        if self.max_entries > 0:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, instance_id, tree_hash, tests_hash, env_fingerprint):
+        return hashlib.sha256(
+            "\0".join([instance_id, tree_hash, tests_hash, env_fingerprint]).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        if key is None:
+            self.misses += 1
+            return None
+
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Entries written by other versions may have a different shape
+        if not isinstance(entry, dict) or any(k not in entry for k in self.ENTRY_KEYS):
+            print(f"Discarding malformed result cache entry {entry_path.name}")
+            self._remove(entry_path)
+            self.misses += 1
+            return None
+
+        # Refresh the mtime so eviction sees this entry as recently used
+        entry_path.touch()
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        if not self.enabled:
+            return
+
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        tmp_path.replace(entry_path)
+        self.evict()
+
+    def evict(self):
+        entries = sorted(
+            self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime
+        )
+        for entry_path in entries[: max(0, len(entries) - self.max_entries)]:
+            self._remove(entry_path)
+
+        cutoff = time.time() - self.TMP_MAX_AGE
+        for tmp_path in self.cache_dir.glob("*.tmp"):
+            try:
+                if tmp_path.stat().st_mtime < cutoff:
+                    self._remove(tmp_path)
+            except OSError:
+                pass
+
+    def _remove(self, path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(list(self.cache_dir.glob("*.json"))),
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,308 @@
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from swebench_evaluator.distributed import Coordinator, Worker
+
+
+class StubEvaluator:
+    def __init__(self, repos_dir, cached_repos=(), delay=0.0, failing=()):
+        self.repos_dir = repos_dir
+        self.repos_dir.mkdir(parents=True, exist_ok=True)
+        for repo_name in cached_repos:
+            (self.repos_dir / repo_name.replace("/", "_")).mkdir()
+        self.delay = delay
+        self.failing = set(failing)
+        self.evaluated = []
+        self.cancelled = []
+
+    def evaluate_solution(self, instance_id, solution_commit, cancelled=None):
+        deadline = time.time() + self.delay
+        while time.time() < deadline:
+            if cancelled is not None and cancelled.is_set():
+                self.cancelled.append(instance_id)
+                return {"instance_id": instance_id, "cancelled": True}
+            time.sleep(0.01)
+        if instance_id in self.failing:
+            raise OSError(f"Could not clone repository for {instance_id}")
+        self.evaluated.append((instance_id, solution_commit))
+        return {
+            "instance_id": instance_id,
+            "solution_commit": solution_commit,
+            "timestamp": time.time(),
+            "metrics": {"success_rate": 1.0},
+        }
+
+
+def make_configs(*instance_ids):
+    return [
+        {"instance_id": instance_id, "solution_commit": f"commit-{i}"}
+        for i, instance_id in enumerate(instance_ids)
+    ]
+
+
+def run_workers(workers, timeout=30):
+    completed = {}
+    threads = [
+        threading.Thread(
+            target=lambda w=w: completed.__setitem__(w.worker_id, w.run()),
+            daemon=True,
+        )
+        for w in workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout)
+        assert not thread.is_alive(), "worker did not finish"
+    return completed
+
+
+def post(url, payload):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+@pytest.fixture
+def coordinator_factory(tmp_path):
+    coordinators = []
+
+    def factory(configs, **kwargs):
+        coordinator = Coordinator(configs, tmp_path / "results", port=0, **kwargs)
+        coordinators.append(coordinator)
+        return coordinator
+
+    yield factory
+    for coordinator in coordinators:
+        coordinator.stop()
+
+
+def make_worker(tmp_path, url, worker_id, **kwargs):
+    evaluator = StubEvaluator(tmp_path / worker_id / "repos", **kwargs)
+    return Worker(
+        evaluator,
+        url,
+        worker_id=worker_id,
+        heartbeat_interval=0.05,
+        poll_interval=0.05,
+        max_retries=2,
+    )
+
+
+def test_several_workers_complete_all_jobs(tmp_path, coordinator_factory):
+    configs = make_configs(*[f"owner__name-{i}" for i in range(6)])
+    coordinator = coordinator_factory(configs)
+    url = coordinator.start()
+
+    workers = [make_worker(tmp_path, url, f"w{i}", delay=0.05) for i in range(3)]
+    completed = run_workers(workers)
+
+    assert coordinator.finished.is_set()
+    assert sum(completed.values()) == 6
+    assert len(list((tmp_path / "results").glob("*.json"))) == 6
+    evaluated = sorted(e for w in workers for e in w.evaluator.evaluated)
+    assert evaluated == sorted(
+        (c["instance_id"], c["solution_commit"]) for c in configs
+    )
+
+
+def test_failed_job_is_retried_on_another_worker(tmp_path, coordinator_factory):
+    configs = make_configs("owner__flaky-1", "owner__name-2", "owner__name-3")
+    coordinator = coordinator_factory(configs)
+    url = coordinator.start()
+
+    flaky = make_worker(tmp_path, url, "flaky", delay=0.2, failing={"owner__flaky-1"})
+    healthy = make_worker(tmp_path, url, "healthy", delay=0.1)
+    flaky_thread = threading.Thread(target=flaky.run, daemon=True)
+    flaky_thread.start()
+    time.sleep(0.05)
+    run_workers([healthy])
+    flaky_thread.join(10)
+
+    assert coordinator.finished.is_set()
+    result = coordinator.completed["0"]
+    assert "error" not in result
+    assert result["worker_id"] == "healthy"
+    assert [f["worker_id"] for f in coordinator.jobs["0"]["failures"]] == ["flaky"]
+    assert coordinator.status()["failed_attempts"] == 1
+
+
+def test_job_failing_everywhere_is_recorded_after_max_attempts(
+    tmp_path, coordinator_factory
+):
+    configs = make_configs("owner__name-1", "owner__missing-2")
+    coordinator = coordinator_factory(configs, max_attempts=3)
+    url = coordinator.start()
+
+    workers = [
+        make_worker(tmp_path, url, f"w{i}", failing={"owner__missing-2"})
+        for i in range(2)
+    ]
+    run_workers(workers)
+
+    assert coordinator.finished.is_set()
+    failed = coordinator.completed["1"]
+    assert failed["instance_id"] == "owner__missing-2"
+    assert "Could not clone" in failed["error"]
+    assert len(failed["failures"]) == 3
+    assert "error" not in coordinator.completed["0"]
+
+
+def test_workers_cannot_share_a_cache(tmp_path, coordinator_factory):
+    coordinator = coordinator_factory(make_configs("owner__name-1"))
+    url = coordinator.start()
+
+    first = make_worker(tmp_path, url, "first")
+    lock_file = first._lock_cache()
+    try:
+        second = Worker(StubEvaluator(first.evaluator.repos_dir), url)
+        with pytest.raises(RuntimeError, match="different --cache-dir"):
+            second.run()
+    finally:
+        lock_file.close()
+
+    run_workers([first])
+    assert coordinator.finished.is_set()
+
+
+def test_result_is_kept_when_coordinator_cannot_store_it(
+    tmp_path, coordinator_factory
+):
+    coordinator = coordinator_factory(make_configs("owner__name-1"))
+    url = coordinator.start()
+    output_dir = coordinator.output_dir
+    coordinator.output_dir = tmp_path / "missing"
+
+    def restore_output_dir():
+        time.sleep(0.5)
+        coordinator.output_dir = output_dir
+
+    threading.Thread(target=restore_output_dir, daemon=True).start()
+    worker = make_worker(tmp_path, url, "w0")
+    completed = run_workers([worker])
+
+    assert completed == {"w0": 1}
+    assert coordinator.finished.is_set()
+    assert len(worker.evaluator.evaluated) == 1
+
+
+def test_losing_worker_abandons_stolen_job(tmp_path, coordinator_factory):
+    coordinator = coordinator_factory(make_configs("owner__name-1"), steal_after=0.1)
+    url = coordinator.start()
+
+    slow = make_worker(tmp_path, url, "slow", delay=10)
+    fast = make_worker(tmp_path, url, "fast")
+    slow_thread = threading.Thread(target=slow.run, daemon=True)
+    slow_thread.start()
+    time.sleep(0.2)
+    run_workers([fast])
+    slow_thread.join(5)
+
+    assert not slow_thread.is_alive()
+    assert slow.evaluator.cancelled == ["owner__name-1"]
+    assert coordinator.completed["0"]["worker_id"] == "fast"
+    assert coordinator.status()["stolen"] == 1
+
+
+def test_expired_lease_is_requeued(coordinator_factory):
+    coordinator = coordinator_factory(
+        make_configs("owner__name-1"), lease_timeout=0.1, steal_after=None
+    )
+
+    assert coordinator.lease("dead")["job"]["job_id"] == "0"
+    assert coordinator.lease("other")["job"] is None
+
+    time.sleep(0.2)
+    assert coordinator.lease("other")["job"]["job_id"] == "0"
+    assert coordinator.status()["requeued"] == 1
+
+
+def test_stolen_job_is_accepted_once(tmp_path, coordinator_factory):
+    coordinator = coordinator_factory(make_configs("owner__name-1"), steal_after=0)
+    coordinator.start()
+
+    assert coordinator.lease("slow")["job"]["job_id"] == "0"
+    assert coordinator.lease("fast")["job"]["job_id"] == "0"
+    assert coordinator.status()["stolen"] == 1
+
+    result = {"instance_id": "owner__name-1", "timestamp": time.time()}
+    assert coordinator.complete("fast", "0", dict(result)) == {"accepted": True}
+    assert coordinator.complete("slow", "0", dict(result)) == {"accepted": False}
+    assert coordinator.completed["0"]["worker_id"] == "fast"
+    assert len(list((tmp_path / "results").glob("*.json"))) == 1
+    assert coordinator.finished.is_set()
+
+
+def test_jobs_for_cached_repos_are_leased_first(coordinator_factory):
+    coordinator = coordinator_factory(
+        make_configs("org__first-1", "org__second-2", "org__second-3")
+    )
+
+    job = coordinator.lease("w0", cached_repos=["org_second"])["job"]
+    assert job["repo"] == "org/second"
+    assert coordinator.lease("w1", cached_repos=[])["job"]["repo"] == "org/first"
+
+
+def test_worker_reports_cached_repos(tmp_path, coordinator_factory):
+    coordinator = coordinator_factory(make_configs("org__first-1", "org__second-2"))
+    url = coordinator.start()
+
+    worker = make_worker(tmp_path, url, "w0", cached_repos=["org/second"])
+    worker.max_retries = 1
+    run_workers([worker])
+
+    assert [e[0] for e in worker.evaluator.evaluated] == [
+        "org__second-2",
+        "org__first-1",
+    ]
+
+
+def test_malformed_results_are_rejected(tmp_path, coordinator_factory):
+    coordinator = coordinator_factory(make_configs("owner__name-1"))
+    url = coordinator.start()
+    coordinator.lease("w0")
+
+    for result in ["not an object", ["list"]]:
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            post(url + "/result", {"worker_id": "w0", "job_id": "0", "result": result})
+        assert excinfo.value.code == 400
+    assert coordinator.status()["completed"] == 0
+
+    # Client-supplied values never end up in the output path
+    response = post(
+        url + "/result",
+        {
+            "worker_id": "w0",
+            "job_id": "0",
+            "result": {"instance_id": "../../escaped", "timestamp": "abc"},
+        },
+    )
+    assert response == {"accepted": True}
+    assert coordinator.finished.is_set()
+    (output_file,) = (tmp_path / "results").glob("*.json")
+    assert output_file.name.startswith("owner__name-1_0_")
+    assert not list(tmp_path.parent.glob("escaped*"))
+
+
+def test_client_errors_are_not_retried(tmp_path, coordinator_factory):
+    coordinator = coordinator_factory(make_configs("owner__name-1"))
+    url = coordinator.start()
+    worker = make_worker(tmp_path, url, "w0")
+    worker.max_retries = 5
+    worker.poll_interval = 1
+
+    start = time.time()
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        worker._post("/result", {"worker_id": "w0", "job_id": "0", "result": []})
+
+    assert excinfo.value.code == 400
+    assert time.time() - start < 1
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from swebench_evaluator.evaluator import SWEBenchEvaluator
+from swebench_evaluator.result_cache import ResultCache, environment_fingerprint
+
+
+def git(repo_path, *args):
+    return subprocess.run(
+        ["git", "-C", str(repo_path), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def solution_repo(tmp_path):
+    """
+    A repository with a failing test on the base commit, a fix, and a second
+    solution commit whose tree is identical to the fix.
+    """
+    repo_path = tmp_path / "upstream"
+    repo_path.mkdir()
+    git(repo_path, "init", "-q")
+    git(repo_path, "config", "user.email", "eval@example.com")
+    git(repo_path, "config", "user.name", "eval")
+
+    (repo_path / "module.py").write_text("VALUE = 0\n")
+    (repo_path / "test_module.py").write_text(
+        "from module import VALUE\n\n\ndef test_value():\n    assert VALUE == 1\n"
+    )
+    git(repo_path, "add", ".")
+    git(repo_path, "commit", "-qm", "base")
+    base_commit = git(repo_path, "rev-parse", "HEAD")
+
+    (repo_path / "module.py").write_text("VALUE = 1\n")
+    git(repo_path, "commit", "-qam", "fix")
+    fix_commit = git(repo_path, "rev-parse", "HEAD")
+
+    git(repo_path, "commit", "-q", "--allow-empty", "-m", "same tree")
+    same_tree_commit = git(repo_path, "rev-parse", "HEAD")
+
+    return repo_path, base_commit, fix_commit, same_tree_commit
+
+
+def make_evaluator(tmp_path, repo_path, base_commit, result_cache_size=8):
+    evaluator = SWEBenchEvaluator(
+        cache_dir=tmp_path / "cache", result_cache_size=result_cache_size
+    )
+    problem = {
+        "repo": "local/upstream",
+        "base_commit": base_commit,
+        "FAIL_TO_PASS": json.dumps(["test_module.py::test_value"]),
+        "PASS_TO_PASS": "[]",
+    }
+    evaluator.get_problem_by_id = lambda instance_id: problem
+    evaluator.get_repo_url = lambda repo_name: str(repo_path)
+    return evaluator
+
+
+def test_same_tree_is_served_from_cache(tmp_path, solution_repo):
+    repo_path, base_commit, fix_commit, same_tree_commit = solution_repo
+    evaluator = make_evaluator(tmp_path, repo_path, base_commit)
+
+    first = evaluator.evaluate_solution("local__upstream-1", fix_commit)
+    assert first["cache"]["hit"] is False
+    assert first["metrics"]["fixed_tests"] == 1
+
+    evaluator.run_tests = lambda *args, **kwargs: pytest.fail("tests were rerun")
+    second = evaluator.evaluate_solution("local__upstream-1", same_tree_commit)
+    assert second["cache"]["hit"] is True
+    assert second["cache"]["evaluated_commit"] == fix_commit
+    assert second["solution_commit"] == same_tree_commit
+    assert second["after"] == first["after"]
+    assert second["metrics"] == first["metrics"]
+    assert evaluator.result_cache.stats()["hits"] == 1
+    assert evaluator.result_cache.stats()["misses"] == 1
+
+
+def test_results_with_run_errors_are_not_cached(tmp_path, solution_repo):
+    repo_path, base_commit, fix_commit, same_tree_commit = solution_repo
+    evaluator = make_evaluator(tmp_path, repo_path, base_commit)
+    evaluator.run_tests = lambda repo_path, tests, timeout=300: {
+        test: {"passed": False, "error": "timeout", "duration": timeout}
+        for test in tests
+    }
+
+    evaluator.evaluate_solution("local__upstream-1", fix_commit)
+    second = evaluator.evaluate_solution("local__upstream-1", same_tree_commit)
+
+    assert second["cache"]["hit"] is False
+    assert evaluator.result_cache.stats()["entries"] == 0
+
+
+def test_unresolved_commit_is_counted_as_miss(tmp_path, solution_repo):
+    repo_path, base_commit, fix_commit, same_tree_commit = solution_repo
+    evaluator = make_evaluator(tmp_path, repo_path, base_commit)
+
+    results = evaluator.evaluate_solution("local__upstream-1", "0" * 40)
+
+    assert results["cache"] == {"hit": False, "key": None}
+    assert evaluator.result_cache.stats()["misses"] == 1
+
+
+def test_disabled_cache_is_not_consulted(tmp_path, solution_repo):
+    repo_path, base_commit, fix_commit, same_tree_commit = solution_repo
+    evaluator = make_evaluator(tmp_path, repo_path, base_commit, result_cache_size=0)
+
+    evaluator.evaluate_solution("local__upstream-1", fix_commit)
+    results = evaluator.evaluate_solution("local__upstream-1", same_tree_commit)
+
+    assert "cache" not in results
+    assert results["metrics"]["fixed_tests"] == 1
+    assert evaluator.result_cache.stats()["hits"] == 0
+    assert evaluator.result_cache.stats()["misses"] == 0
+    assert not (tmp_path / "cache" / "results").exists()
+
+
+def make_entry(solution_commit):
+    return {
+        "solution_commit": solution_commit,
+        "before": {},
+        "after": {},
+        "metrics": {},
+    }
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResultCache(tmp_path / "results", max_entries=2)
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, make_entry(key))
+        os.utime(cache._entry_path(key), (i, i))
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == make_entry("a")
+    cache.put("c", make_entry("c"))
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == make_entry("a")
+    assert cache.get("c") == make_entry("c")
+
+
+def test_malformed_entry_is_a_miss_and_removed(tmp_path):
+    cache = ResultCache(tmp_path / "results")
+    cache._entry_path("old").write_text(json.dumps({"after": {}}))
+    cache._entry_path("list").write_text(json.dumps(["not", "an", "entry"]))
+
+    assert cache.get("old") is None
+    assert cache.get("list") is None
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_orphaned_temporary_files_are_cleaned_up(tmp_path):
+    cache = ResultCache(tmp_path / "results")
+    orphan = cache.cache_dir / "orphan.tmp"
+    orphan.write_text("{")
+    os.utime(orphan, (0, 0))
+    recent = cache.cache_dir / "recent.tmp"
+    recent.write_text("{")
+
+    cache.put("a", make_entry("a"))
+
+    assert not orphan.exists()
+    assert recent.exists()
+
+
+def test_fingerprint_ignores_working_directory(tmp_path, monkeypatch):
+    clean_dir = tmp_path / "clean"
+    clean_dir.mkdir()
+    monkeypatch.chdir(clean_dir)
+    clean = environment_fingerprint(sys.executable)
+
+    repo_dir = tmp_path / "repo"
+    (repo_dir / "unrelated_pkg.egg-info").mkdir(parents=True)
+    (repo_dir / "unrelated_pkg.egg-info" / "PKG-INFO").write_text(
+        "Metadata-Version: 2.1\nName: unrelated-pkg\nVersion: 1.0\n"
+    )
+    monkeypatch.chdir(repo_dir)
+
+    assert environment_fingerprint(sys.executable) == clean